@@ -123,17 +123,31 @@ class PsychophysicsTestApp:
         self.last_width = 1200
         self.last_height = 900
 
+        # Pending debounced update (Tk `after` id)
+        self._pending = None
+
+        # (source image, display size, resized image) reused while only sliders change
+        self._base_cache = None
+
+        # Noise generator and display buffers reused across updates
+        self._rng = np.random.default_rng()
+        self._noise_buf = None
+        self._noisy_buf = None
+        self.adjusted_photo = None
+        self.processed_photo = None
+
     def on_resize(self, event):
         """Handle window resize events"""
-        # Only resize if the window size has changed significantly
-        if (abs(event.width - self.last_width) > 50 or
-                abs(event.height - self.last_height) > 50):
+        # Child widgets report <Configure> too; only the main window size matters
+        if event.widget is not self.master:
+            return
+
+        if (event.width, event.height) != (self.last_width, self.last_height):
             self.last_width = event.width
             self.last_height = event.height
 
-            # Reprocess images if they exist
-            if self.original_pil_image is not None:
-                self.display_images()
+            # Reprocess images once the resize settles
+            self.update_modifications()
 
     def load_image(self):
         """Open file dialog to load an image"""
@@ -182,8 +196,8 @@ class PsychophysicsTestApp:
             self.contrast_slider.get(),
             display_size
         )
-        self.adjusted_photo = ImageTk.PhotoImage(self.adjusted_pil_image)
-        self.adjusted_image_label.config(image=self.adjusted_photo)
+        self.adjusted_photo = self._show_image(self.adjusted_photo, self.adjusted_image_label,
+                                               self.adjusted_pil_image)
 
         # Apply brightness, contrast, and noise modifications
         processed_display = self.apply_image_modifications(
@@ -194,11 +208,30 @@ class PsychophysicsTestApp:
             display_size,
             self.noise_type_var.get()
         )
-        self.processed_photo = ImageTk.PhotoImage(processed_display)
-        self.processed_image_label.config(image=self.processed_photo)
+        self.processed_photo = self._show_image(self.processed_photo, self.processed_image_label,
+                                                processed_display)
+
+    def _show_image(self, photo, label, pil_image):
+        """Paste into the existing PhotoImage if the size is unchanged, otherwise create a new one"""
+        if photo is None or (photo.width(), photo.height()) != pil_image.size:
+            photo = ImageTk.PhotoImage(pil_image)
+            label.config(image=photo)
+        else:
+            photo.paste(pil_image)
+        return photo
+
+    def _resized_base(self, pil_image, target_size):
+        """Return the image resized to display size, cached until the image or size changes"""
+        if (self._base_cache is None or self._base_cache[0] is not pil_image or
+                self._base_cache[1] != target_size):
+            self._base_cache = (pil_image, target_size, pil_image.resize(target_size, Image.BILINEAR))
+        return self._base_cache[2]
 
     def apply_bc_modifications(self, pil_image, brightness_value, contrast_value, target_size):
         """Apply brightness and contrast modifications to an image"""
+        # Work at display resolution
+        pil_image = self._resized_base(pil_image, target_size)
+
         # Apply brightness
         brightness_enhancer = ImageEnhance.Brightness(pil_image)
         brightness_image = brightness_enhancer.enhance(float(brightness_value))
@@ -207,13 +240,13 @@ class PsychophysicsTestApp:
         contrast_enhancer = ImageEnhance.Contrast(brightness_image)
         contrast_image = contrast_enhancer.enhance(float(contrast_value))
 
-        # Resize
-        final_image = contrast_image.resize(target_size, Image.LANCZOS)
-
-        return final_image
+        return contrast_image
 
     def apply_image_modifications(self, pil_image, brightness_value, contrast_value, noise_value, target_size, noise_type):
         """Apply brightness, contrast, and noise modifications to an image"""
+        # Work at display resolution
+        pil_image = self._resized_base(pil_image, target_size)
+
         # Apply brightness and contrast
         brightness_enhancer = ImageEnhance.Brightness(pil_image)
         brightness_image = brightness_enhancer.enhance(float(brightness_value))
@@ -221,70 +254,77 @@ class PsychophysicsTestApp:
         contrast_enhancer = ImageEnhance.Contrast(brightness_image)
         contrast_image = contrast_enhancer.enhance(float(contrast_value))
 
-        # Convert to numpy array
-        noise_image = np.array(contrast_image)
+        # View as numpy array (read-only; copied only where modified in place)
+        noise_image = np.asarray(contrast_image)
+
+        # Float32 noise buffer reused while the display size is unchanged
+        if self._noise_buf is None or self._noise_buf.shape != noise_image.shape:
+            self._noise_buf = np.empty(noise_image.shape, np.float32)
+        noise = self._noise_buf
+        scale = float(noise_value) * 255
 
         # Generate noise based on selected type
         if noise_type == "Gaussian":
             # Standard Gaussian (normal) noise
-            noise = np.random.normal(0, float(noise_value) * 255, noise_image.shape).astype(np.uint8)
+            self._rng.standard_normal(out=noise, dtype=np.float32)
+            noise *= scale
         elif noise_type == "Salt and Pepper":
             # Salt and pepper noise
-            noise_mask = np.random.random(noise_image.shape[:2])  # 2D noise mask
+            noise_mask = self._rng.random(noise_image.shape[:2], dtype=np.float32)  # 2D noise mask
             salt_mask = noise_mask < float(noise_value) / 2
             pepper_mask = noise_mask > 1 - float(noise_value) / 2
 
-            # Initialize salt_pepper_noise to match noise_image
-            salt_pepper_noise = np.zeros_like(noise_image)
-
-            # Apply salt and pepper noise masks
-            if len(noise_image.shape) == 2:  # Grayscale image
-                salt_pepper_noise[salt_mask] = 255
-                salt_pepper_noise[pepper_mask] = 0
-            elif len(noise_image.shape) == 3:  # RGB image
-                # Expand salt_mask and pepper_mask to match RGB channels
-                salt_pepper_noise[salt_mask, :] = 255
-                salt_pepper_noise[pepper_mask, :] = 0
-
-            print("salt_pepper_noise shape:", salt_pepper_noise.shape)
-            print("noise_image shape:", noise_image.shape)
-
-            # Apply salt and pepper noise
-            noise_image = np.where(salt_pepper_noise != 0, salt_pepper_noise, noise_image)
-            noise = np.zeros_like(noise_image)  # Reset noise (if needed elsewhere)
-
+            # Apply salt and pepper noise in place (masks broadcast over RGB channels)
+            noise_image = noise_image.copy()
+            noise_image[salt_mask] = 255
+            noise_image[pepper_mask] = 0
 
         elif noise_type == "Speckle":
             # Multiplicative noise
-            noise = np.random.normal(0, float(noise_value), noise_image.shape)
+            noise = self._rng.normal(0, float(noise_value), noise_image.shape)
             noise_image = (noise_image * (1 + noise)).astype(np.uint8)
-            noise = np.zeros_like(noise_image)
         elif noise_type == "Uniform":
-            # Uniform noise
-            noise = np.random.uniform(-float(noise_value) * 255, float(noise_value) * 255, noise_image.shape).astype(np.uint8)
+            # Uniform noise in [-scale, scale)
+            self._rng.random(out=noise, dtype=np.float32)
+            noise -= 0.5
+            noise *= 2 * scale
         elif noise_type == "Exponential":
-            # Exponential noise
-            noise = np.random.exponential(float(noise_value) * 255, noise_image.shape).astype(np.uint8)
+            # Exponential noise, clipped so the later cast cannot overflow
+            self._rng.standard_exponential(out=noise, dtype=np.float32)
+            noise *= scale
+            np.clip(noise, 0, 255, out=noise)
         else:
             # Default to Gaussian if unknown type
-            noise = np.random.normal(0, float(noise_value) * 255, noise_image.shape).astype(np.uint8)
+            self._rng.standard_normal(out=noise, dtype=np.float32)
+            noise *= scale
 
         # Apply noise
         if noise_type not in ["Salt and Pepper", "Speckle"]:
-            noisy_image = np.clip(noise_image + noise, 0, 255).astype(np.uint8)
+            # Add and clip in place in the float noise buffer, then cast once
+            np.add(noise, noise_image, out=noise)
+            np.clip(noise, 0, 255, out=noise)
+            if self._noisy_buf is None or self._noisy_buf.shape != noise.shape:
+                self._noisy_buf = np.empty(noise.shape, np.uint8)
+            np.copyto(self._noisy_buf, noise, casting='unsafe')
+            noisy_image = self._noisy_buf
         else:
             noisy_image = noise_image
 
-        # Convert back to PIL Image
-        final_image = Image.fromarray(noisy_image)
-
-        # Resize
-        final_image = final_image.resize(target_size, Image.LANCZOS)
+        # Wrap the array as a PIL Image without copying
+        final_image = Image.frombuffer(contrast_image.mode, contrast_image.size, noisy_image,
+                                       'raw', contrast_image.mode, 0, 1)
 
         return final_image
 
     def update_modifications(self, event=None):
+        """Schedule an image update, coalescing rapid slider and resize events"""
+        if self._pending is not None:
+            self.master.after_cancel(self._pending)
+        self._pending = self.master.after(30, self._do_update)
+
+    def _do_update(self):
         """Update image modifications based on slider values"""
+        self._pending = None
         if self.original_pil_image is not None:
             self.display_images()
 
@@ -2,6 +2,14 @@ import cv2
 import numpy as np
 from matplotlib import pyplot as plt
 
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is optional; adaptive_sr falls back to NumPy
+    njit = None
+
+# Shared noise generator (faster than the legacy np.random functions)
+_rng = np.random.default_rng()
+
 def adjust_image_contrast(image, alpha=1.5, beta=0.0):
     """
     Convert image to float and modify contrast
@@ -49,39 +57,83 @@ def apply_sr_rgb(image, noise_level=0.1):
     if image.dtype != np.float32 and image.dtype != np.float64:
         image = image.astype(np.float32)
 
-    # Split into channels
-    channels = cv2.split(image)
-
-    # Apply SR to each channel
-    sr_channels = []
-    for channel in channels:
-        # Generate noise with same data type as input
-        noise = np.random.normal(0, noise_level, channel.shape).astype(channel.dtype)
-
-        # Add noise and clip to valid range
-        channel_sr = np.clip(channel + noise, 0.0, 1.0)
-
-        sr_channels.append(channel_sr)
+    # Generate noise for all channels with same data type as input
+    noise = _rng.standard_normal(image.shape, dtype=image.dtype)
+    np.multiply(noise, noise_level, out=noise)
+
+    # Add noise and clip to valid range
+    np.add(noise, image, out=noise)
+    np.clip(noise, 0.0, 1.0, out=noise)
+
+    return noise
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _apply_varying_noise(image, noise_map, normal, out):
+        """
+        Add per-pixel scaled noise to a uint8 image in a single pass
+
+        Args:
+        image (numpy.ndarray): Input uint8 image (H x W x C)
+        noise_map (numpy.ndarray): Per-pixel noise standard deviation (H x W)
+        normal (numpy.ndarray): Standard normal samples, same shape as image
+        out (numpy.ndarray): Output uint8 array, same shape as image
+        """
+        height, width, channels = image.shape
+        for i in prange(height):
+            for j in range(width):
+                scale = noise_map[i, j]
+                for c in range(channels):
+                    value = image[i, j, c] + normal[i, j, c] * scale
+                    if value < 0.0:
+                        value = 0.0
+                    elif value > 255.0:
+                        value = 255.0
+                    out[i, j, c] = np.uint8(value)
+else:
+    _apply_varying_noise = None
+
+
+def _local_std(gray, r):
+    """
+    Local standard deviation over a (2r+1) x (2r+1) window
 
-    # Merge channels
-    return cv2.merge(sr_channels)
+    Args:
+    gray (numpy.ndarray): Single-channel image
+    r (int): Window radius
 
-def adaptive_sr(image, base_noise=0.1):
+    Returns:
+    numpy.ndarray: float32 local standard deviation, same shape as gray
+    """
+    # cv2.boxFilter/sqrBoxFilter use running sums, so cost is independent of r
+    gray_f = np.float32(gray)
+    ksize = (2 * r + 1, 2 * r + 1)
+    local_mean = cv2.boxFilter(gray_f, -1, ksize)
+    local_sq_mean = cv2.sqrBoxFilter(gray_f, -1, ksize)
+    return np.sqrt(np.maximum(local_sq_mean - local_mean**2, 0))
+
+def adaptive_sr(image, base_noise=0.1, out=None):
     # Calculate local contrast
     gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    local_std = cv2.boxFilter(np.float32(gray), -1, (21,21))
+    local_std = _local_std(gray, 10)  # 21x21 window
     
     # Adjust noise level based on local contrast
     noise_map = base_noise * (1.0 - local_std/255.0)
     
-    # Apply varying noise levels
-    result = np.zeros_like(image)
-    for i in range(3):
-        channel = image[:,:,i]
-        noise = np.random.normal(0, 1, channel.shape) * noise_map
-        result[:,:,i] = np.clip(channel + noise, 0, 255).astype(np.uint8)
+    # Apply varying noise levels; pass `out` to reuse the result buffer across frames
+    if out is None:
+        out = np.empty_like(image)
+    if _apply_varying_noise is not None:
+        normal = _rng.standard_normal(image.shape, dtype=np.float32)
+        _apply_varying_noise(image, noise_map, normal, out)
+    else:
+        noise = _rng.standard_normal(image.shape, dtype=np.float32)
+        noise *= noise_map[:, :, None]
+        noise += image
+        np.clip(noise, 0, 255, out=noise)
+        np.copyto(out, noise, casting='unsafe')
     
-    return result
+    return out
 
 def main():
     # Read an image
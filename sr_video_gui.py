@@ -1,9 +1,106 @@
 import tkinter as tk
 from tkinter import filedialog, ttk
-from PIL import Image, ImageEnhance, ImageTk, ImageFilter
+import PIL
+from PIL import Image, ImageTk, ImageFilter
 import numpy as np
 import time
-import random
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from numba import njit, prange, types
+except ImportError:  # Numba is optional; noise falls back to NumPy
+    njit = None
+
+try:
+    import cv2
+except ImportError:  # OpenCV is optional; Pillow does all resizing without it
+    cv2 = None
+
+try:
+    import cupy as cp
+    if cp.cuda.runtime.getDeviceCount() == 0:
+        cp = None
+except Exception:  # CuPy is optional and needs a CUDA device; noise is otherwise added on the CPU
+    cp = None
+
+# Noise is triangular, (u1 + u2 - 1) * scale, rather than Gaussian: it needs no
+# log/cos per pixel and looks the same at these amplitudes. Samples are rounded
+# to whole grey levels, which adds variance ~1/12 (Sheppard's correction); the
+# scale removes it, so the measured standard deviation matches sigma to about
+# 0.1% for every non-zero slider value (sigma >= 2.55).
+_rng = np.random.Generator(np.random.SFC64())
+
+
+def _triangular_scale(sigma):
+    """Scale for (u1 + u2 - 1), variance 1/6, giving standard deviation sigma after rounding"""
+    return np.sqrt(6.0 * max(sigma * sigma - 1.0 / 12.0, 0.0))
+
+
+# Noise is drawn at 1/NOISE_SCALE resolution, one sample per NOISE_SCALE x NOISE_SCALE
+# block. Replicating (rather than interpolating) keeps the per-pixel sigma unchanged.
+NOISE_SCALE = 2
+
+
+if njit is not None:
+    # Compiled eagerly for C-contiguous uint8 frames (the source may be a read-only
+    # view of a PIL image). Numba types carry no shape, so one build covers all sizes.
+    _frame_u8 = types.Array(types.uint8, 3, 'C')
+    _frame_u8_readonly = types.Array(types.uint8, 3, 'C', readonly=True)
+
+    @njit([types.void(_frame_u8, _frame_u8, types.float64),
+           types.void(_frame_u8, _frame_u8_readonly, types.float64)],
+          parallel=True, nogil=True, fastmath=True, boundscheck=False, cache=True)
+    def add_noise_u8(out, src, sigma):
+        """Add zero-mean noise with standard deviation sigma to a uint8 (H x W x C) image and clip, in one fused pass"""
+        # Numba keeps its own generator state per thread; it is never reseeded.
+        # Same scale as _triangular_scale; noise is rounded once per block, so the
+        # per-pixel add and clip stay in int32 with no float round trip
+        scale = np.sqrt(6.0 * max(sigma * sigma - 1.0 / 12.0, 0.0))
+        height, width, channels = src.shape
+        for bi in prange((height + NOISE_SCALE - 1) // NOISE_SCALE):
+            noise = np.empty(channels, np.int32)
+            i0 = bi * NOISE_SCALE
+            i1 = min(i0 + NOISE_SCALE, height)
+            for j0 in range(0, width, NOISE_SCALE):
+                j1 = min(j0 + NOISE_SCALE, width)
+                for c in range(channels):
+                    noise[c] = round((np.random.random() + np.random.random() - 1.0) * scale)
+                for i in range(i0, i1):
+                    for j in range(j0, j1):
+                        for c in range(channels):
+                            value = np.int32(src[i, j, c]) + noise[c]
+                            out[i, j, c] = np.uint8(0 if value < 0 else 255 if value > 255 else value)
+else:
+    def add_noise_u8(out, src, sigma):
+        """Add zero-mean noise with standard deviation sigma to a uint8 (H x W x C) image and clip"""
+        height, width, channels = src.shape
+        small_shape = (-(-height // NOISE_SCALE), -(-width // NOISE_SCALE), channels)
+        noise = _rng.random(small_shape, dtype=np.float32)
+        noise += _rng.random(small_shape, dtype=np.float32)
+        noise -= 1.0
+        noise *= _triangular_scale(sigma)
+        noise = np.rint(noise).astype(np.int16)
+        noise = noise.repeat(NOISE_SCALE, axis=0).repeat(NOISE_SCALE, axis=1)[:height, :width]
+        noise += src
+        np.clip(noise, 0, 255, out=noise)
+        np.copyto(out, noise, casting='unsafe')
+
+
+# Resampling filters offered for display resizing; "Auto" (None) picks one per image
+RESAMPLE_FILTERS = {
+    "Auto": None,
+    "Bilinear": Image.BILINEAR,
+    "Bicubic": Image.BICUBIC,
+    "Lanczos": Image.LANCZOS
+}
+
+# OpenCV equivalents used for upscaling, where they are faster and give the same
+# result (bilinear is within 1 grey level). Bicubic stays on Pillow: OpenCV uses
+# a=-0.75 against Pillow's a=-0.5, which differs by tens of levels. Downscales stay
+# on Pillow, which antialiases; OpenCV's Lanczos is no faster.
+CV2_INTERPOLATION = {} if cv2 is None else {
+    Image.BILINEAR: cv2.INTER_LINEAR
+}
 
 
 class PsychophysicsTestApp:
@@ -22,7 +119,21 @@ class PsychophysicsTestApp:
         self.load_frame.grid(row=0, column=0, columnspan=2, pady=10)
 
         self.load_button = tk.Button(self.load_frame, text="Load Image", command=self.load_image)
-        self.load_button.pack()
+        self.load_button.pack(side=tk.LEFT, padx=5)
+
+        # Resampling filter selection
+        tk.Label(self.load_frame, text="Resampling:").pack(side=tk.LEFT, padx=5)
+        self.resample_var = tk.StringVar(value="Auto")
+        self.resample = RESAMPLE_FILTERS[self.resample_var.get()]
+        self.resample_dropdown = ttk.Combobox(
+            self.load_frame,
+            textvariable=self.resample_var,
+            values=list(RESAMPLE_FILTERS),
+            state="readonly",
+            width=10
+        )
+        self.resample_dropdown.pack(side=tk.LEFT, padx=5)
+        self.resample_dropdown.bind('<<ComboboxSelected>>', self.on_resample_change)
 
         # Original image display
         self.original_frame = tk.Frame(master, borderwidth=1, relief=tk.SUNKEN)
@@ -100,28 +211,80 @@ class PsychophysicsTestApp:
         # Bind resize event
         master.bind('<Configure>', self.on_resize)
 
+        # Stop the noise worker before the window goes away
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
+
         # Initial state
         self.original_pil_image = None
-        self.processed_pil_image = None
+        self._display_base = None
+        self.target_size = None
         self.last_width = 1200
         self.last_height = 900
 
         # Noise update variables
         self.noise_update_interval = 66  # ~15 times per second (1000ms / 15)
         self.is_noise_updating = False
-        self.noise_seed = None
+        self._noise_job = None
+
+        # Noise frames are rendered on a worker thread (the kernel releases the GIL)
+        # so Tk keeps handling events meanwhile; the Tk thread polls for the result,
+        # so Tk is only ever called from that thread. The generation is bumped on
+        # stop so a frame rendered from outdated settings is discarded when it lands.
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._noise_future = None
+        self._noise_poll_job = None
+        self._noise_generation = 0
+
+        # Pending debounced updates (Tk `after` ids)
+        self._pending_update = None
+        self._pending_resize = None
+
+        # Brightness/contrast result and noise output reused across noise frames
+        self._bc_cache = None
+        self._bc_array = None
+        self._out_array = None
+        self._bc_gpu = None
+
+        # Image and (display size, filter) the original panel was last drawn for
+        self._original_source = None
+        self._original_key = None
+
+        # Tk images reused (pasted into) while the display size is unchanged
+        self.original_photo = None
+        self.processed_photo = None
+
+        # Run the noise kernel once on the main thread: starting Numba's thread pool
+        # from the worker thread hangs at exit
+        warmup_src = np.zeros((1, 1, 3), np.uint8)
+        warmup_src.setflags(write=False)  # frames arrive as read-only views of PIL images
+        add_noise_u8(np.empty_like(warmup_src), warmup_src, 0.0)
 
     def on_resize(self, event):
         """Handle window resize events"""
-        # Only resize if the window size has changed significantly
-        if (abs(event.width - self.last_width) > 50 or
-                abs(event.height - self.last_height) > 50):
+        # Child widgets report <Configure> too; only the main window size matters
+        if event.widget is not self.master:
+            return
+
+        if (event.width, event.height) != (self.last_width, self.last_height):
             self.last_width = event.width
             self.last_height = event.height
 
-            # Reprocess images if they exist
-            if self.original_pil_image is not None:
-                self.display_images()
+            # Reprocess images once the resize settles
+            if self._pending_resize is not None:
+                self.master.after_cancel(self._pending_resize)
+            self._pending_resize = self.master.after(100, self._do_resize)
+
+    def _do_resize(self):
+        """Redisplay images at the current window size"""
+        self._pending_resize = None
+        if self.original_pil_image is not None:
+            self.display_images()
+
+    def on_resample_change(self, event=None):
+        """Switch the resampling filter used for display resizing"""
+        self.resample = RESAMPLE_FILTERS[self.resample_var.get()]
+        if self.original_pil_image is not None:
+            self.display_images()
 
     def load_image(self):
         """Open file dialog to load an image"""
@@ -132,8 +295,16 @@ class PsychophysicsTestApp:
             ]
         )
         if file_path:
-            # Load the original image
+            # Load the original image; for JPEGs let the decoder scale down
+            # (DCT scaling) to no less than twice the current display area
             self.original_pil_image = Image.open(file_path)
+            max_display_width = (self.master.winfo_width() - 40) // 2
+            max_display_height = self.master.winfo_height() - 250
+            self.original_pil_image.draft('RGB', (max_display_width * 2, max_display_height * 2))
+
+            # Convert once to RGB so every later pass works on 3 plain channels
+            # (palette, greyscale and CMYK are expanded; alpha is discarded)
+            self.original_pil_image = self.original_pil_image.convert('RGB')
 
             # Display images
             self.display_images()
@@ -143,9 +314,12 @@ class PsychophysicsTestApp:
         if self.original_pil_image is None:
             return
 
-        # Stop any ongoing noise updates
-        self.stop_noise_updates()
+        # The noise loop keeps running if the image, size and filter are unchanged
+        if self._refresh_original():
+            self._refresh_processed_base()
 
+    def _refresh_original(self):
+        """Resize the original image to the window and display it; returns False if nothing changed"""
         # Calculate display dimensions
         window_width = self.master.winfo_width()
         window_height = self.master.winfo_height()
@@ -163,52 +337,122 @@ class PsychophysicsTestApp:
             display_height = max_height
             display_width = int(display_height * original_aspect)
 
-        # Resize and display original image
-        original_display = self.original_pil_image.copy()
-        original_display = original_display.resize((display_width, display_height), Image.LANCZOS)
-        self.original_photo = ImageTk.PhotoImage(original_display)
-        self.original_image_label.config(image=self.original_photo)
-
-        # Create a copy for processing
-        self.processed_pil_image = self.original_pil_image.copy()
-
-        # Apply current brightness, contrast, and noise settings
-        self.target_size = (display_width, display_height)
-        self.noise_seed = random.randint(0, 2 ** 32 - 1)  # Use Python's random module
+        target_size = (display_width, display_height)
+
+        # Auto uses BOX (area averaging) for downscales of 2x or more: it is much cheaper
+        # than the other filters and looks as good or better, but blurs mild reductions,
+        # so those use bilinear. An explicit choice from the dropdown is always honoured.
+        resample = self.resample
+        if resample is None:
+            ratio = self.original_pil_image.width / display_width
+            resample = Image.BOX if ratio >= 2 else Image.BILINEAR
+
+        if (self._original_source is self.original_pil_image and
+                self._original_key == (target_size, resample)):
+            return False
+
+        # Resize once; brightness, contrast and noise are applied at display resolution
+        self.target_size = target_size
+        self._display_base = self._resize(self.original_pil_image, self.target_size, resample)
+        self._original_source = self.original_pil_image
+        self._original_key = (target_size, resample)
+
+        # Display original image
+        self.original_photo = self._show_image(self.original_photo, self.original_image_label,
+                                               self._display_base)
+        return True
+
+    def _resize(self, pil_image, size, resample):
+        """Resize with OpenCV where it is equivalent and faster, otherwise with Pillow"""
+        if resample in CV2_INTERPOLATION and size[0] > pil_image.width:
+            resized = cv2.resize(np.asarray(pil_image), size, interpolation=CV2_INTERPOLATION[resample])
+            return Image.fromarray(resized)
+        return pil_image.resize(size, resample)
+
+    def _show_image(self, photo, label, pil_image):
+        """Paste into the existing PhotoImage if the size is unchanged, otherwise create a new one"""
+        if photo is None or (photo.width(), photo.height()) != pil_image.size:
+            photo = ImageTk.PhotoImage(pil_image)
+            label.config(image=photo)
+        else:
+            photo.paste(pil_image)
+        return photo
+
+    def _refresh_processed_base(self):
+        """Restart the noise loop from the new display-size base image"""
+        # Stop any ongoing noise updates
+        self.stop_noise_updates()
+        self._bc_cache = None
 
         # Start periodic noise updates
         self.start_noise_updates()
 
-    def apply_image_modifications(self, pil_image, brightness_value, contrast_value, noise_value, target_size,
-                                  noise_seed=None):
-        """Apply brightness, contrast, and noise modifications to an image"""
-        # Apply brightness
-        brightness_enhancer = ImageEnhance.Brightness(pil_image)
-        brightness_image = brightness_enhancer.enhance(float(brightness_value))
-
-        # Apply contrast
-        contrast_enhancer = ImageEnhance.Contrast(brightness_image)
-        contrast_image = contrast_enhancer.enhance(float(contrast_value))
-
-        # Convert to numpy array for noise
-        noise_image = np.array(contrast_image)
+    def apply_bc_modifications(self, pil_image, brightness_value, contrast_value):
+        """Apply brightness and contrast modifications to an image in a single lookup-table pass"""
+        # Brightness scales each level (truncating, like ImageEnhance.Brightness)
+        levels = np.arange(256, dtype=np.float64)
+        brightened = np.minimum(np.floor(levels * float(brightness_value)), 255)
 
-        # Use provided noise seed if available
-        if noise_seed is not None:
-            np.random.seed(noise_seed)
+        # ImageEnhance.Contrast pivots around the mean grey level of the brightened
+        # image; estimate it from the grey histogram instead of a second image pass
+        histogram = np.asarray(pil_image.convert('L').histogram(), dtype=np.float64)
+        mean = int((histogram * brightened).sum() / histogram.sum() + 0.5)
 
-        # Generate and add noise
-        noise = np.random.normal(0, float(noise_value) * 255, noise_image.shape).astype(np.uint8)
-        noisy_image = np.clip(noise_image + noise, 0, 255).astype(np.uint8)
+        lut = np.clip(mean + (brightened - mean) * float(contrast_value), 0, 255).astype(np.uint8)
+        return pil_image.point(lut.tolist() * 3)
 
-        # Convert back to PIL Image
-        final_image = Image.fromarray(noisy_image)
+    def update_bc_cache(self, brightness_value, contrast_value):
+        """Recompute the brightness/contrast base array only when those sliders change"""
+        if self._bc_cache == (brightness_value, contrast_value):
+            return
 
-        # Resize
-        final_image = final_image.resize(target_size, Image.LANCZOS)
+        contrast_image = self.apply_bc_modifications(self._display_base, brightness_value, contrast_value)
+
+        # View as numpy array for noise. Both arrays are C-contiguous uint8 (H x W x 3),
+        # so Image.frombuffer can wrap them without a copy
+        self._bc_array = np.ascontiguousarray(np.asarray(contrast_image), dtype=np.uint8)
+        self._out_array = np.empty(self._bc_array.shape, np.uint8)
+        if cp is not None:
+            # Keep the base resident on the GPU; only the noisy frame is copied back
+            self._bc_gpu = cp.asarray(self._bc_array, dtype=cp.float32)
+        self._bc_cache = (brightness_value, contrast_value)
+
+    def apply_noise(self, noise_value):
+        """Add noise to the cached display-size brightness/contrast image"""
+        if float(noise_value) == 0.0:
+            # Nothing to add; show the brightness/contrast image as is
+            result = self._bc_array
+        elif cp is not None:
+            self._apply_noise_gpu(float(noise_value) * 255)
+            result = self._out_array
+        else:
+            # Generate and add noise in one pass; the generators advance on their own
+            add_noise_u8(self._out_array, self._bc_array, float(noise_value) * 255)
+            result = self._out_array
+
+        # Wrap the result as a PIL Image without copying; the array is held on self, so
+        # its memory stays valid until the frame has been pasted into the PhotoImage
+        height, width = result.shape[:2]
+        final_image = Image.frombuffer('RGB', (width, height), result, 'raw', 'RGB', 0, 1)
 
         return final_image
 
+    def _apply_noise_gpu(self, sigma):
+        """Add noise on the GPU and copy the clipped uint8 frame into the output array"""
+        # Same rounded triangular noise as add_noise_u8, so the stimulus does not
+        # depend on which backend is available
+        height, width, channels = self._bc_gpu.shape
+        small_shape = (-(-height // NOISE_SCALE), -(-width // NOISE_SCALE), channels)
+        noise = cp.random.random(small_shape, dtype=cp.float32)
+        noise += cp.random.random(small_shape, dtype=cp.float32)
+        noise -= 1.0
+        noise *= _triangular_scale(sigma)
+        cp.rint(noise, out=noise)
+        noise = noise.repeat(NOISE_SCALE, axis=0).repeat(NOISE_SCALE, axis=1)[:height, :width]
+        noisy = noise + self._bc_gpu
+        cp.clip(noisy, 0, 255, out=noisy)
+        noisy.astype(cp.uint8).get(out=self._out_array)
+
     def start_noise_updates(self):
         """Start periodic noise updates"""
         if not self.is_noise_updating:
@@ -218,39 +462,88 @@ class PsychophysicsTestApp:
     def stop_noise_updates(self):
         """Stop periodic noise updates"""
         self.is_noise_updating = False
+        self._noise_generation += 1
+        if self._noise_job is not None:
+            self.master.after_cancel(self._noise_job)
+            self._noise_job = None
 
     def update_noise_periodically(self):
         """Update noise image periodically"""
+        self._noise_job = None
         if not self.is_noise_updating or self.original_pil_image is None:
             return
 
-        # Apply current modifications with new noise seed
-        self.noise_seed = random.randint(0, 2 ** 32 - 1)  # Use Python's random module
-        processed_display = self.apply_image_modifications(
-            self.processed_pil_image,
-            self.brightness_slider.get(),
-            self.contrast_slider.get(),
-            self.noise_slider.get(),
-            self.target_size,
-            self.noise_seed
-        )
-        self.processed_photo = ImageTk.PhotoImage(processed_display)
-        self.processed_image_label.config(image=self.processed_photo)
+        # A frame is still rendering from the shared buffers; it restarts the loop when it lands
+        if self._noise_future is not None:
+            return
+
+        # Brightness/contrast are only recomputed when their sliders move
+        self.update_bc_cache(self.brightness_slider.get(), self.contrast_slider.get())
+
+        # Without noise every frame is identical; show it and stay idle until a slider moves
+        noise_value = float(self.noise_slider.get())
+        if noise_value == 0.0:
+            self.processed_photo = self._show_image(self.processed_photo, self.processed_image_label,
+                                                    self.apply_noise(noise_value))
+            self.is_noise_updating = False
+            return
+
+        # Render with fresh noise off the Tk thread; only the Tk thread touches widgets
+        self._noise_future = self._executor.submit(self.apply_noise, noise_value)
+        self._poll_noise_frame(self._noise_generation)
+
+    def _poll_noise_frame(self, generation):
+        """Display the worker's frame once it is ready and schedule the next one"""
+        if not self._noise_future.done():
+            self._noise_poll_job = self.master.after(5, self._poll_noise_frame, generation)
+            return
+
+        self._noise_poll_job = None
+        future, self._noise_future = self._noise_future, None
+        if generation != self._noise_generation:
+            # Settings changed while rendering; render again from the current state
+            self.update_noise_periodically()
+            return
+
+        self.processed_photo = self._show_image(self.processed_photo, self.processed_image_label,
+                                                future.result())
 
         # Schedule next update
-        self.master.after(self.noise_update_interval, self.update_noise_periodically)
+        self._noise_job = self.master.after(self.noise_update_interval, self.update_noise_periodically)
+
+    def on_close(self):
+        """Stop noise updates and the worker thread, then close the window"""
+        self.stop_noise_updates()
+        if self._noise_poll_job is not None:
+            self.master.after_cancel(self._noise_poll_job)
+            self._noise_poll_job = None
+        self._executor.shutdown(wait=True)  # at most one frame is in flight
+        self.master.destroy()
 
     def update_modifications(self, value):
+        """Schedule an image update, coalescing rapid slider events"""
+        if self._pending_update is not None:
+            self.master.after_cancel(self._pending_update)
+        self._pending_update = self.master.after(30, self._do_update)
+
+    def _do_update(self):
         """Update image modifications based on slider values"""
+        self._pending_update = None
         if self.original_pil_image is not None:
             # Stop current updates
             self.stop_noise_updates()
 
-            # Restart periodic updates
+            # Restart periodic updates (renders once and stays idle if noise is zero)
             self.start_noise_updates()
 
 
 def main():
+    # Resize and enhancer passes are much faster with Pillow-SIMD (see README);
+    # its releases carry a ".postN" version suffix
+    print(f"Pillow {PIL.__version__}")
+    if ".post" not in PIL.__version__:
+        print("Pillow-SIMD not detected; install it for faster resizing (see README)")
+
     root = tk.Tk()
     app = PsychophysicsTestApp(root)
     root.mainloop()